@@ -3,18 +3,20 @@
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from src.config import settings
-from src.database import close_db, init_db
+from src.database import AsyncSessionLocal, close_db, init_db, warm_up_pool
 from src.file_storage.router import router as file_storage_router
 from src.logger import get_logger
 from src.script_executor.router import router as script_router
+from src.script_executor.service import ScriptExecutorService
 from src.auth.router import router as auth_router
 from src.scripts_manager.router import router as scripts_manager_router
+from src.scripts_manager.service import ScriptsManagerService
 
 
 logger = get_logger(__name__)
@@ -42,6 +44,15 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized for development")
     
+    await warm_up_pool()
+    
+    # Shared services, created once before serving requests; the executor reuses
+    # the same scripts manager instead of building its own
+    app.state.scripts_service = ScriptsManagerService()
+    app.state.script_executor = ScriptExecutorService(app.state.scripts_service)
+    async with AsyncSessionLocal() as db:
+        await app.state.scripts_service.init_tree_version(db)
+    
     yield
     
     # Shutdown
@@ -94,19 +105,16 @@ async def get_code_example():
     logger.info("Reading example file", path=str(example_file), exists=example_file.exists())
     
     if not example_file.exists():
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Example file not found")
     
     try:
         content = example_file.read_text(encoding="utf-8")
         logger.info("Example file read successfully", length=len(content))
-        from fastapi.responses import PlainTextResponse
         return PlainTextResponse(
             content=content,
             headers={"Cache-Control": "no-cache"},
         )
     except Exception as e:
-        from fastapi import HTTPException
         logger.error("Failed to read example file", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to read example file: {str(e)}")
 
@@ -27,6 +27,30 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./scripts_manager.db",
         description="Database URL (SQLite for dev, PostgreSQL for prod)",
     )
+    db_pool_size: int = Field(
+        default=20,
+        description="Connections kept open in the pool (server databases only)",
+    )
+    db_max_overflow: int = Field(
+        default=10,
+        description="Extra connections allowed above pool size under load",
+    )
+    db_pool_timeout: int = Field(
+        default=30,
+        description="Seconds to wait for a free connection before failing",
+    )
+    db_pool_recycle: int = Field(
+        default=3600,
+        description="Seconds after which pooled connections are reopened",
+    )
+    delete_batch_size: int = Field(
+        default=500,
+        description="Rows deleted per statement when removing folder subtrees",
+    )
+    tree_stream_batch_size: int = Field(
+        default=500,
+        description="Rows fetched per batch when streaming the scripts tree",
+    )
     
     # JWT Authentication
     jwt_secret_key: str = Field(
@@ -45,8 +69,18 @@ class Settings(BaseSettings):
     # Security
     max_script_execution_time: int = 300  # seconds
     max_file_size: int = 100 * 1024 * 1024  # 100 MB
+    max_script_size: int = 1024 * 1024  # characters, larger scripts are rejected before parsing
     allowed_script_extensions: set[str] = {".py"}
     
+    # Caching
+    scripts_tree_cache_ttl: int = 30  # seconds, entries are also checked against the DB tree version
+    scripts_tree_cache_size: int = 256
+    script_validation_cache_ttl: int = 3600  # seconds, verdicts depend only on content
+    script_validation_cache_size: int = 1024
+    script_content_cache_ttl: int = 300  # seconds, entries are keyed by file mtime
+    script_content_cache_size: int = 256
+    script_content_cache_max_file_size: int = 64 * 1024  # bytes, larger files are read uncached
+    
     # API
     api_prefix: str = "/api/v1"
 
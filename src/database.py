@@ -1,5 +1,7 @@
 """Database configuration and session management."""
 
+import asyncio
+
 from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -18,11 +20,23 @@ class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
     pass
 
+# Pool sizing applies to server databases; SQLite keeps SQLAlchemy's default pool
+engine_options: dict = {}
+if "sqlite" not in settings.database_url:
+    engine_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
 # Database engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
+    **engine_options,
 )
 
 
@@ -81,6 +95,23 @@ async def init_db() -> None:
     logger.info("Database initialized", database_url=settings.database_url)
 
 
+async def warm_up_pool() -> None:
+    """
+    Open pooled connections on startup, so first requests do not pay connect latency.
+    SQLite connections are cheap to open and are not warmed up.
+    """
+    if "sqlite" in settings.database_url:
+        return
+    
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    # Concurrent checkouts force the pool to open pool_size distinct connections
+    await asyncio.gather(*(ping() for _ in range(settings.db_pool_size)))
+    logger.info("Database pool warmed up", connections=settings.db_pool_size)
+
+
 async def close_db() -> None:
     """Close database connections."""
     await engine.dispose()
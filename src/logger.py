@@ -1,7 +1,10 @@
 """Logger setup"""
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 import structlog
 
@@ -21,10 +24,18 @@ def configure_logging(log_level: str = settings.log_level) -> None:
     Note:
         In development environment, logs are rendered to console with colors.
         In other environments, logs are rendered as JSON.
+        Records are handed to a background thread through a queue, so writing
+        to stdout never blocks the event loop.
     """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Flush queued records on interpreter exit
+    atexit.register(listener.stop)
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
+        handlers=[QueueHandler(log_queue)],
         level=getattr(logging, log_level),
     )
     processors = [
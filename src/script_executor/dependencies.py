@@ -0,0 +1,18 @@
+"""FastAPI dependencies for script executor."""
+
+from fastapi import Request
+
+from src.script_executor.service import ScriptExecutorService
+
+
+async def get_script_executor(request: Request) -> ScriptExecutorService:
+    """
+    Get shared script executor service created on application startup.
+    
+    Args:
+        request: Current request
+        
+    Returns:
+        ScriptExecutorService instance from application state
+    """
+    return request.app.state.script_executor
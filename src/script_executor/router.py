@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import get_db
 from src.logger import get_logger
+from src.script_executor.dependencies import get_script_executor
 from src.script_executor.schemas import ScriptExecutionResponse
 from src.script_executor.service import ScriptExecutionError, ScriptExecutorService
 
@@ -16,9 +17,6 @@ from src.script_executor.service import ScriptExecutionError, ScriptExecutorServ
 logger = get_logger(__name__)
 router = APIRouter(prefix="/scripts", tags=["scripts"])
 
-# Initialize service
-script_executor: ScriptExecutorService = ScriptExecutorService()
-
 
 @router.post(
     "/{script_path:path}",
@@ -34,6 +32,7 @@ async def execute_script(
     script_path: str,
     data: dict[str, Any] = Body(default_factory=dict),
     db: AsyncSession = Depends(get_db),
+    script_executor: ScriptExecutorService = Depends(get_script_executor),
 ) -> ScriptExecutionResponse:
     """
     Execute a Python script by calling its main() function.
@@ -55,6 +54,7 @@ async def execute_script(
         script_path: Logical path to script (e.g., "geology/test.py")
         data: JSON body (any structure, defaults to empty dict)
         db: Database session
+        script_executor: Script executor service
         
     Returns:
         ScriptExecutionResponse with execution result
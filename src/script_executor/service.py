@@ -27,11 +27,16 @@ class ScriptExecutionError(Exception):
 class ScriptExecutorService:
     """Service for executing Python scripts with input data."""
 
-    def __init__(self):
-        """Initialize script executor service."""
+    def __init__(self, scripts_manager: ScriptsManagerService):
+        """
+        Initialize script executor service.
+        
+        Args:
+            scripts_manager: Shared scripts manager service used for script lookups
+        """
         self.scripts_dir = settings.scripts_dir.resolve()
         self.max_execution_time = settings.max_script_execution_time
-        self.scripts_manager = ScriptsManagerService()
+        self.scripts_manager = scripts_manager
 
     async def _get_script_storage_path(
         self,
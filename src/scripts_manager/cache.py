@@ -0,0 +1,90 @@
+"""Process-local caches for scripts manager."""
+
+import time
+from collections.abc import Hashable
+from typing import Any
+
+from src.config import settings
+
+
+class TTLCache:
+    """Size-bounded in-memory mapping whose entries expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries kept in memory
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on miss or expired entry
+
+        Returns:
+            Cached value or default
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return default
+
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store value, evicting the oldest entry when the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # Dicts keep insertion order, so the first key is the oldest one
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Remove entry if present.
+
+        Args:
+            key: Cache key
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+
+# (user ID, is admin) -> (tree version, rendered /tree response body)
+scripts_tree_cache: TTLCache = TTLCache(
+    maxsize=settings.scripts_tree_cache_size,
+    ttl=settings.scripts_tree_cache_ttl,
+)
+
+# BLAKE2b digest of script content -> (is_valid, error_message) validation verdict
+script_validation_cache: TTLCache = TTLCache(
+    maxsize=settings.script_validation_cache_size,
+    ttl=settings.script_validation_cache_ttl,
+)
+
+# (storage filename, size, mtime_ns) -> decoded script file content
+script_content_cache: TTLCache = TTLCache(
+    maxsize=settings.script_content_cache_size,
+    ttl=settings.script_content_cache_ttl,
+)
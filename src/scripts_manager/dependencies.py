@@ -0,0 +1,77 @@
+"""FastAPI dependencies for scripts manager."""
+
+import codecs
+
+from fastapi import Request, UploadFile, status
+
+from src.scripts_manager.error_codes import ErrorCode
+from src.scripts_manager.error_handler import create_error_response
+from src.scripts_manager.service import ScriptsManagerService
+from src.scripts_manager.validators import is_valid_script_filename
+
+# Uploaded files are read and decoded in chunks of this size
+UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
+
+async def get_scripts_service(request: Request) -> ScriptsManagerService:
+    """
+    Get shared scripts manager service created on application startup.
+    
+    Args:
+        request: Current request
+        
+    Returns:
+        ScriptsManagerService instance from application state
+    """
+    return request.app.state.scripts_service
+
+
+async def read_script_upload(file: UploadFile) -> tuple[str, str]:
+    """
+    Validate uploaded script filename and read its content.
+    
+    Declared before the database dependencies in the endpoint signature, so the
+    file is read and decoded before a pooled connection is checked out.
+    
+    Args:
+        file: Script file (.py)
+        
+    Returns:
+        Tuple of (filename, decoded content)
+        
+    Raises:
+        HTTPException: If filename is missing or invalid, or file is not UTF-8
+    """
+    filename: str | None = file.filename
+    if not filename:
+        raise create_error_response(
+            ErrorCode.VALIDATION_ERROR,
+            "Имя файла обязательно",
+            status.HTTP_400_BAD_REQUEST,
+        )
+    
+    if not is_valid_script_filename(filename):
+        raise create_error_response(
+            ErrorCode.INVALID_FILENAME,
+            "Имя файла должно иметь расширение .py и содержать от 4 до 255 символов",
+            status.HTTP_400_BAD_REQUEST,
+            {"filename": filename},
+        )
+    
+    # Read and decode file content chunk by chunk to avoid holding raw bytes and text at once.
+    # "utf-8-sig" drops a leading BOM (added by some Windows editors) from the first chunk only
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    parts: list[str] = []
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        raise create_error_response(
+            ErrorCode.INVALID_SCRIPT_CONTENT,
+            "Файл скрипта должен быть в кодировке UTF-8",
+            status.HTTP_400_BAD_REQUEST,
+            {"filename": filename},
+        )
+    
+    return filename, "".join(parts)
@@ -1,30 +1,42 @@
 """Database models for scripts and folders management."""
 
 from datetime import datetime
-from typing import TYPE_CHECKING
-
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    event,
+    inspect,
+    update,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
+from src.auth.models import User
 from src.database import Base
 
-if TYPE_CHECKING:
-    from src.auth.models import User
-
 
 class Folder(Base):
     """Folder model for organizing scripts."""
 
     __tablename__ = "folders"
+    __table_args__ = (
+        # BRIN fits append-mostly timestamps; other dialects keep no index here
+        Index(
+            "ix_folders_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ).ddl_if(dialect="postgresql"),
+    )
+    # Fetch server-generated values (updated_at) with RETURNING on UPDATE too,
+    # so updated rows are usable after commit without a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id: int = Column(Integer, primary_key=True, index=True)
     name: str = Column(String, nullable=False)
@@ -73,13 +85,31 @@ class Script(Base):
     """Script model for Python scripts."""
 
     __tablename__ = "scripts"
+    __table_args__ = (
+        # BRIN fits append-mostly timestamps; other dialects keep no index here
+        Index(
+            "ix_scripts_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ).ddl_if(dialect="postgresql"),
+    )
+    # Fetch server-generated values (updated_at) with RETURNING on UPDATE too,
+    # so updated rows are usable after commit without a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id: int = Column(Integer, primary_key=True, index=True)
     filename: str = Column(String, nullable=False)  # Original filename for display
-    storage_filename: str = Column(String, nullable=False, index=True)  # Physical filename in scripts/ directory
+    storage_filename: str = Column(String, unique=True, nullable=False)  # Physical filename in scripts/ directory
     logical_path: str = Column(String, unique=True, index=True, nullable=False)  # Logical path for execution (e.g., "geology/test.py")
     display_name: str = Column(String, nullable=False)
-    description: str | None = Column(Text, nullable=True)
+    # Deferred: only detail views render it, so list/lookup queries skip the TEXT payload
+    description: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+        deferred=True,
+        deferred_group="detail",
+    )
     folder_id: int | None = Column(
         Integer,
         ForeignKey("folders.id", ondelete="CASCADE"),
@@ -110,3 +140,33 @@ class Script(Base):
         """String representation of Script."""
         return f"<Script(id={self.id}, filename='{self.filename}', logical_path='{self.logical_path}')>"
 
+
+# Primary key of the single ScriptsTreeVersion row
+TREE_VERSION_ROW_ID: int = 1
+
+
+class ScriptsTreeVersion(Base):
+    """Single-row counter bumped in every transaction that changes the scripts tree."""
+
+    __tablename__ = "scripts_tree_version"
+
+    id: int = Column(Integer, primary_key=True)
+    version: int = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        """String representation of ScriptsTreeVersion."""
+        return f"<ScriptsTreeVersion(version={self.version})>"
+
+
+@event.listens_for(User, "after_update")
+def bump_tree_version_on_login_change(mapper, connection, target: User) -> None:
+    """
+    Bump tree version when a user login changes, as trees render creator logins.
+    Runs on the flushing connection, so the bump commits together with the rename.
+    """
+    if inspect(target).attrs.login.history.has_changes():
+        connection.execute(
+            update(ScriptsTreeVersion.__table__)
+            .where(ScriptsTreeVersion.__table__.c.id == TREE_VERSION_ROW_ID)
+            .values(version=ScriptsTreeVersion.__table__.c.version + 1)
+        )
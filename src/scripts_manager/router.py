@@ -1,34 +1,82 @@
 """Router for scripts and folders management endpoints."""
 
-from datetime import datetime
+import hashlib
+import logging
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Body, Depends, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Body, Depends, Form, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
 
 from src.auth.dependencies import get_current_active_user
 from src.auth.models import User
 from src.database import get_db
 from src.logger import get_logger
-from src.scripts_manager.error_handler import handle_scripts_manager_error
+from src.scripts_manager.cache import scripts_tree_cache
+from src.scripts_manager.dependencies import get_scripts_service, read_script_upload
+from src.scripts_manager.error_codes import ErrorCode
+from src.scripts_manager.error_handler import create_error_response, handle_scripts_manager_error
 from src.scripts_manager.exceptions import ScriptsManagerError
+from src.scripts_manager.models import Folder, Script
 from src.scripts_manager.schemas import (
     ErrorResponse,
     FolderCreate,
     FolderResponse,
     FolderTreeItem,
     FolderUpdate,
+    OptionalDescription,
+    OptionalFolderId,
     ScriptCreate,
     ScriptResponse,
     ScriptUpdate,
+    ScriptsContentBatchRequest,
+    ScriptsContentBatchResponse,
     ScriptsTreeResponse,
 )
 from src.scripts_manager.service import ScriptsManagerService
+from src.scripts_manager.validators import is_valid_script_filename
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/scripts-manager", tags=["scripts-manager"])
+router = APIRouter(
+    prefix="/scripts-manager",
+    tags=["scripts-manager"],
+    default_response_class=ORJSONResponse,
+)
 
-# Initialize service
-scripts_service: ScriptsManagerService = ScriptsManagerService()
+# Response detail for unexpected errors, copied per response
+_INTERNAL_ERROR_DETAIL: dict[str, str] = {
+    "error_code": ErrorCode.INTERNAL_ERROR.value,
+    "message": "Произошла непредвиденная ошибка",
+}
+
+# Detail lookups built once at import, values are bound per request
+_FOLDER_BY_ID = (
+    select(Folder)
+    .where(Folder.id == bindparam("folder_id"))
+    .options(joinedload(Folder.created_by).load_only(User.id, User.login))
+)
+_SCRIPT_BY_ID = (
+    select(Script)
+    .where(Script.id == bindparam("script_id"))
+    .options(
+        # Everything ScriptResponse renders, including deferred description;
+        # storage_filename is internal and not loaded
+        load_only(
+            Script.id,
+            Script.filename,
+            Script.logical_path,
+            Script.display_name,
+            Script.description,
+            Script.folder_id,
+            Script.created_by_id,
+            Script.created_at,
+            Script.updated_at,
+        ),
+        joinedload(Script.created_by).load_only(User.id, User.login),
+    )
+)
 
 
 def handle_error(error: Exception, context: str = "") -> HTTPException:
@@ -43,19 +91,81 @@ def handle_error(error: Exception, context: str = "") -> HTTPException:
         HTTPException with error response
     """
     if isinstance(error, ScriptsManagerError):
-        logger.warning(f"Scripts manager error in {context}", error=str(error), error_code=error.error_code.value)
+        # Expected 4xx path: skip building the event when warnings are filtered out
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(f"Scripts manager error in {context}", error=str(error), error_code=error.error_code.value)
         return handle_scripts_manager_error(error)
     
     logger.error(f"Unexpected error in {context}", error=str(error), exc_info=True)
     return HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        detail={
-            "error_code": "INTERNAL_ERROR",
-            "message": "Произошла непредвиденная ошибка",
-        },
+        detail=dict(_INTERNAL_ERROR_DETAIL),
     )
 
 
+def detail_etag(tree_version: int, kind: str, item_id: int, user: User) -> str:
+    """
+    Build ETag of a folder or script detail response before loading it.
+    
+    Every folder/script write and login change bumps the tree version, and the
+    per-user fields (edit permission, ownership) depend only on the user's ID and
+    admin flag, so the tag changes whenever the rendered body can.
+    
+    Args:
+        tree_version: Current tree version
+        kind: "f" for folders, "s" for scripts
+        item_id: Folder or script ID
+        user: Current user
+        
+    Returns:
+        Weak entity tag, quoted
+    """
+    return f'W/"{tree_version:x}-{kind}{item_id:x}-{user.id:x}-{int(user.is_admin)}"'
+
+
+def etag_json_response(request: Request, body: bytes) -> Response:
+    """
+    Send already rendered JSON body with an ETag, or 304 if the client already has it.
+    
+    The tag is a hash of the rendered body, so it also changes when
+    per-user fields (permissions, owner login) change.
+    
+    Args:
+        request: Incoming request
+        body: Rendered JSON body
+        
+    Returns:
+        JSON response with ETag header or empty 304 response
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check if request's If-None-Match header matches ETag.
+    
+    Args:
+        request: Incoming request
+        etag: Current entity tag, quoted, optionally with W/ prefix
+        
+    Returns:
+        True if client already has this version
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    # Weak comparison (RFC 9110): W/ prefix is ignored on both sides
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags or "*" in tags
+
+
 @router.post(
     "/folders",
     response_model=FolderResponse,
@@ -72,7 +182,8 @@ async def create_folder(
     folder_data: FolderCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> FolderResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
     """
     Create a new folder.
     
@@ -80,6 +191,7 @@ async def create_folder(
         folder_data: Folder creation data
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Created folder information
@@ -95,19 +207,10 @@ async def create_folder(
             user=current_user,
         )
         
-        # Load relationships
-        await db.refresh(folder, ["created_by"])
-        
-        return FolderResponse(
-            id=folder.id,
-            name=folder.name,
-            path=folder.path,
-            parent_id=folder.parent_id,
-            created_by={"id": folder.created_by.id, "login": folder.created_by.login},
-            created_at=folder.created_at,
-            updated_at=folder.updated_at,
-            can_edit=True,
-            can_delete=True,
+        # Creator always owns the new folder; plain dict rendered by orjson directly
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=scripts_service._build_folder_response(folder, True),
         )
         
     except Exception as e:
@@ -125,34 +228,35 @@ async def create_folder(
 )
 async def get_folder(
     folder_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> FolderResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Get folder information.
     
     Args:
         folder_id: Folder ID
+        request: Incoming request
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
-        Folder information
+        Folder information, or empty 304 response if client's copy is current
         
     Raises:
         HTTPException: If folder not found
     """
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    from src.scripts_manager.error_codes import ErrorCode
-    from src.scripts_manager.error_handler import create_error_response
-    from src.scripts_manager.models import Folder
+    # Tag derived from the tree version: a matching client gets 304 without
+    # the folder load and permission query
+    etag = detail_etag(await scripts_service.get_tree_version(db), "f", folder_id, current_user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    result = await db.execute(
-        select(Folder)
-        .where(Folder.id == folder_id)
-        .options(selectinload(Folder.created_by))
-    )
+    result = await db.execute(_FOLDER_BY_ID, {"folder_id": folder_id})
     folder = result.scalar_one_or_none()
     
     if not folder:
@@ -163,24 +267,14 @@ async def get_folder(
             {"folder_id": str(folder_id)},
         )
     
-    # Check if user is folder owner or parent folder owner
-    can_edit = folder.created_by_id == current_user.id or current_user.is_admin
-    can_delete = folder.created_by_id == current_user.id or current_user.is_admin
-    if not can_edit:
-        can_edit = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-    if not can_delete:
-        can_delete = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-    
-    return FolderResponse(
-        id=folder.id,
-        name=folder.name,
-        path=folder.path,
-        parent_id=folder.parent_id,
-        created_by={"id": folder.created_by.id, "login": folder.created_by.login},
-        created_at=folder.created_at,
-        updated_at=folder.updated_at,
-        can_edit=can_edit,
-        can_delete=can_delete,
+    # Check if user is folder owner or parent folder owner (same rule for edit and delete)
+    can_edit = await scripts_service._can_manage(
+        db, folder.created_by_id, folder.id, current_user
+    )
+    
+    # Plain dict rendered by orjson directly, response_model is kept for OpenAPI only
+    return ORJSONResponse(
+        content=scripts_service._build_folder_response(folder, can_edit), headers=headers
     )
 
 
@@ -201,7 +295,8 @@ async def update_folder(
     folder_data: FolderUpdate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> FolderResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
     """
     Update folder.
     
@@ -210,6 +305,7 @@ async def update_folder(
         folder_data: Folder update data
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Updated folder information
@@ -225,40 +321,15 @@ async def update_folder(
             user=current_user,
         )
         
-        # Ensure folder is fully loaded - refresh to avoid any lazy loading issues
-        await db.refresh(folder, ["created_by", "parent"])
-        
-        # Access all fields immediately to avoid lazy loading
-        folder_id_val: int = folder.id
-        folder_name: str = folder.name
-        folder_path: str = folder.path
-        folder_parent_id: int | None = folder.parent_id
-        folder_created_by_id: int = folder.created_by_id
-        folder_created_at: datetime = folder.created_at
-        folder_updated_at: datetime = folder.updated_at
-        created_by_id: int = folder.created_by.id
-        created_by_login: str = folder.created_by.login
-        
-        # Check if user is folder owner or parent folder owner
-        can_edit = folder_created_by_id == current_user.id or current_user.is_admin
-        can_delete = folder_created_by_id == current_user.id or current_user.is_admin
-        if not can_edit:
-            can_edit = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-        if not can_delete:
-            can_delete = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-        
-        return FolderResponse(
-            id=folder_id_val,
-            name=folder_name,
-            path=folder_path,
-            parent_id=folder_parent_id,
-            created_by={"id": created_by_id, "login": created_by_login},
-            created_at=folder_created_at,
-            updated_at=folder_updated_at,
-            can_edit=can_edit,
-            can_delete=can_delete,
+        # Folder is already reloaded in service with created_by and parent
+        # Check if user is folder owner or parent folder owner (same rule for edit and delete)
+        can_edit = await scripts_service._can_manage(
+            db, folder.created_by_id, folder.id, current_user
         )
         
+        # Same dict builder as get_folder, rendered by orjson without a second validation pass
+        return ORJSONResponse(content=scripts_service._build_folder_response(folder, can_edit))
+        
     except Exception as e:
         raise handle_error(e, "update_folder")
 
@@ -277,7 +348,8 @@ async def delete_folder(
     folder_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> None:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Delete folder.
     
@@ -285,6 +357,10 @@ async def delete_folder(
         folder_id: Folder ID
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
+        
+    Returns:
+        Empty 204 response
         
     Raises:
         HTTPException: If deletion fails
@@ -296,6 +372,8 @@ async def delete_folder(
             user=current_user,
         )
         
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        
     except Exception as e:
         raise handle_error(e, "delete_folder")
 
@@ -314,25 +392,27 @@ async def delete_folder(
     description="Add a new script to the system.",
 )
 async def create_script(
-    file: UploadFile,
+    upload: tuple[str, str] = Depends(read_script_upload),
     display_name: str = Form(...),
-    description: str | None = Form(None),
-    folder_id: int | None = Form(None),
+    description: Annotated[OptionalDescription, Form()] = None,
+    folder_id: Annotated[OptionalFolderId, Form()] = None,
     replace: bool = Form(False),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> ScriptResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
     """
     Create a new script.
     
     Args:
-        file: Script file (.py)
+        upload: Script filename and decoded content of the uploaded .py file
         display_name: Display name for the script
         description: Optional description
         folder_id: Optional folder ID
         replace: If True, replace existing script in the same logical folder
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Created script information
@@ -340,58 +420,24 @@ async def create_script(
     Raises:
         HTTPException: If creation fails
     """
-    from src.scripts_manager.error_codes import ErrorCode
-    from src.scripts_manager.error_handler import create_error_response
-    
-    if not file.filename:
-        raise create_error_response(
-            ErrorCode.VALIDATION_ERROR,
-            "Имя файла обязательно",
-            status.HTTP_400_BAD_REQUEST,
-        )
-    
-    if not file.filename.endswith(".py"):
-        raise create_error_response(
-            ErrorCode.INVALID_FILENAME,
-            "Файл должен иметь расширение .py",
-            status.HTTP_400_BAD_REQUEST,
-            {"filename": file.filename},
-        )
+    filename, content = upload
     
     try:
-        # Read file content
-        content: str = (await file.read()).decode("utf-8")
-        
-        # Normalize folder_id: convert empty string or 0 to None
-        normalized_folder_id: int | None = folder_id if folder_id else None
-        
-        # Normalize description: convert empty string to None
-        normalized_description: str | None = description if description and description.strip() else None
-        
         script = await scripts_service.create_script(
             db=db,
-            filename=file.filename,
+            filename=filename,
             display_name=display_name,
-            description=normalized_description,
-            folder_id=normalized_folder_id,
+            description=description,
+            folder_id=folder_id,
             content=content,
             user=current_user,
             replace=replace,
         )
         
-        # Load relationships (already loaded by service)
-        return ScriptResponse(
-            id=script.id,
-            filename=script.filename,
-            logical_path=script.logical_path,
-            display_name=script.display_name,
-            description=script.description,
-            folder_id=script.folder_id,
-            created_by={"id": script.created_by.id, "login": script.created_by.login},
-            created_at=script.created_at,
-            updated_at=script.updated_at,
-            can_edit=True,
-            can_delete=True,
+        # Creator always owns the new script; plain dict rendered by orjson directly
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=scripts_service._build_script_response(script, current_user, True),
         )
         
     except Exception as e:
@@ -415,12 +461,13 @@ async def create_script_from_text(
     filename: str = Body(..., description="Script filename with .py extension"),
     display_name: str = Body(..., description="Display name for the script"),
     content: str = Body(..., description="Script content (Python code)"),
-    description: str | None = Body(None, description="Optional description"),
-    folder_id: int | None = Body(None, description="Optional folder ID"),
+    description: Annotated[OptionalDescription, Body(description="Optional description")] = None,
+    folder_id: Annotated[OptionalFolderId, Body(description="Optional folder ID")] = None,
     replace: bool = Body(False, description="Replace existing script if it exists"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> ScriptResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
     """
     Create a new script from text content.
     
@@ -433,6 +480,7 @@ async def create_script_from_text(
         replace: If True, replace existing script in the same logical folder
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Created script information
@@ -440,29 +488,17 @@ async def create_script_from_text(
     Raises:
         HTTPException: If creation fails
     """
-    from src.scripts_manager.error_codes import ErrorCode
-    from src.scripts_manager.error_handler import create_error_response
-    
-    # Validate filename
-    if not filename.endswith(".py"):
+    # Validate filename (extension and length)
+    if not is_valid_script_filename(filename):
         raise create_error_response(
             ErrorCode.INVALID_FILENAME,
-            "File must have .py extension",
-            status.HTTP_400_BAD_REQUEST,
-            {"filename": filename},
-        )
-    
-    # Validate filename length
-    if len(filename) < 4 or len(filename) > 255:
-        raise create_error_response(
-            ErrorCode.VALIDATION_ERROR,
-            "Имя файла должно содержать от 4 до 255 символов",
+            "Имя файла должно иметь расширение .py и содержать от 4 до 255 символов",
             status.HTTP_400_BAD_REQUEST,
             {"filename": filename},
         )
     
     # Validate content is not empty
-    if not content or not content.strip():
+    if not content or content.isspace():
         raise create_error_response(
             ErrorCode.VALIDATION_ERROR,
             "Содержимое скрипта не может быть пустым",
@@ -470,37 +506,22 @@ async def create_script_from_text(
         )
     
     try:
-        # Normalize folder_id: convert empty string or 0 to None
-        normalized_folder_id: int | None = folder_id if folder_id else None
-        
-        # Normalize description: convert empty string to None
-        normalized_description: str | None = description if description and description.strip() else None
-        
         # Create script - validation (including main function check) is performed in service
         script = await scripts_service.create_script(
             db=db,
             filename=filename,
             display_name=display_name,
-            description=normalized_description,
-            folder_id=normalized_folder_id,
+            description=description,
+            folder_id=folder_id,
             content=content,
             user=current_user,
             replace=replace,
         )
         
-        # Load relationships (already loaded by service)
-        return ScriptResponse(
-            id=script.id,
-            filename=script.filename,
-            logical_path=script.logical_path,
-            display_name=script.display_name,
-            description=script.description,
-            folder_id=script.folder_id,
-            created_by={"id": script.created_by.id, "login": script.created_by.login},
-            created_at=script.created_at,
-            updated_at=script.updated_at,
-            can_edit=True,
-            can_delete=True,
+        # Creator always owns the new script; plain dict rendered by orjson directly
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=scripts_service._build_script_response(script, current_user, True),
         )
         
     except Exception as e:
@@ -518,34 +539,35 @@ async def create_script_from_text(
 )
 async def get_script(
     script_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> ScriptResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Get script information.
     
     Args:
         script_id: Script ID
+        request: Incoming request
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
-        Script information
+        Script information, or empty 304 response if client's copy is current
         
     Raises:
         HTTPException: If script not found
     """
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    from src.scripts_manager.error_codes import ErrorCode
-    from src.scripts_manager.error_handler import create_error_response
-    from src.scripts_manager.models import Script
+    # Tag derived from the tree version: a matching client gets 304 without
+    # the script load and permission query
+    etag = detail_etag(await scripts_service.get_tree_version(db), "s", script_id, current_user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    result = await db.execute(
-        select(Script)
-        .where(Script.id == script_id)
-        .options(selectinload(Script.created_by))
-    )
+    result = await db.execute(_SCRIPT_BY_ID, {"script_id": script_id})
     script = result.scalar_one_or_none()
     
     if not script:
@@ -556,38 +578,15 @@ async def get_script(
             {"script_id": str(script_id)},
         )
     
-    # Check if user is script owner or folder owner
-    can_edit = script.created_by_id == current_user.id or current_user.is_admin
-    can_delete = script.created_by_id == current_user.id or current_user.is_admin
-    if script.folder_id and not can_edit:
-        from src.scripts_manager.models import Folder
-        folder_result = await db.execute(
-            select(Folder).where(Folder.id == script.folder_id)
-        )
-        folder = folder_result.scalar_one_or_none()
-        if folder:
-            can_edit = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-    if script.folder_id and not can_delete:
-        from src.scripts_manager.models import Folder
-        folder_result = await db.execute(
-            select(Folder).where(Folder.id == script.folder_id)
-        )
-        folder = folder_result.scalar_one_or_none()
-        if folder:
-            can_delete = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-    
-    return ScriptResponse(
-        id=script.id,
-        filename=script.filename,
-        logical_path=script.logical_path,
-        display_name=script.display_name,
-        description=script.description,
-        folder_id=script.folder_id,
-        created_by={"id": script.created_by.id, "login": script.created_by.login},
-        created_at=script.created_at,
-        updated_at=script.updated_at,
-        can_edit=can_edit,
-        can_delete=can_delete,
+    # Check if user is script owner or folder owner (same rule for edit and delete)
+    can_edit = await scripts_service._can_manage(
+        db, script.created_by_id, script.folder_id, current_user
+    )
+    
+    # Plain dict rendered by orjson directly, response_model is kept for OpenAPI only
+    return ORJSONResponse(
+        content=scripts_service._build_script_response(script, current_user, can_edit),
+        headers=headers,
     )
 
 
@@ -601,36 +600,100 @@ async def get_script(
 )
 async def get_script_content(
     script_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> dict[str, str]:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Get script content.
     
     Args:
         script_id: Script ID
+        request: Incoming request
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
-        Script content
+        Script content, or empty 304 response if client's copy is current
         
     Raises:
         HTTPException: If script not found
     """
     try:
-        content = await scripts_service.get_script_content(
+        storage_path, file_stat = await scripts_service.get_script_file(
             db=db,
             script_id=script_id,
             user=current_user,
         )
         
-        return {"content": content}
+        # Script files are only written by the service, so size + mtime identify
+        # the version: a matching client gets 304 without the file being read
+        etag = f'W/"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        
+        if is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        content = await scripts_service.read_script_content(storage_path, file_stat)
+        return ORJSONResponse(content={"content": content}, headers=headers)
         
     except Exception as e:
         raise handle_error(e, "get_script_content")
 
 
+@router.post(
+    "/scripts/content/batch",
+    response_model=ScriptsContentBatchResponse,
+    summary="Get content of several scripts",
+    description=(
+        "Get file content of up to 100 scripts in one request. "
+        "IDs without a script or script file are listed in 'missing'."
+    ),
+)
+async def get_scripts_content_batch(
+    batch: ScriptsContentBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
+    """
+    Get content of several scripts.
+    
+    Args:
+        batch: Requested script IDs
+        db: Database session
+        current_user: Current authenticated user
+        scripts_service: Scripts manager service
+        
+    Returns:
+        Script contents in request order and IDs that were not found
+    """
+    try:
+        # Duplicates are answered once, request order is kept
+        script_ids: list[int] = list(dict.fromkeys(batch.script_ids))
+        contents = await scripts_service.get_scripts_content_batch(
+            db=db,
+            script_ids=script_ids,
+            user=current_user,
+        )
+        
+        return ORJSONResponse(
+            content={
+                "scripts": [
+                    {"id": script_id, "content": contents[script_id]}
+                    for script_id in script_ids
+                    if script_id in contents
+                ],
+                "missing": [script_id for script_id in script_ids if script_id not in contents],
+            }
+        )
+        
+    except Exception as e:
+        raise handle_error(e, "get_scripts_content_batch")
+
+
 @router.put(
     "/scripts/{script_id}",
     response_model=ScriptResponse,
@@ -648,7 +711,8 @@ async def update_script(
     script_data: ScriptUpdate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> ScriptResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> ORJSONResponse:
     """
     Update script.
     
@@ -657,6 +721,7 @@ async def update_script(
         script_data: Script update data
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Updated script information
@@ -675,55 +740,15 @@ async def update_script(
             user=current_user,
         )
         
-        # Script is already reloaded in service with all relationships
-        # Ensure script is fully loaded - refresh to avoid any lazy loading issues
-        await db.refresh(script, ["created_by", "folder"])
-        
-        # Access all fields immediately to avoid lazy loading
-        script_id_val: int = script.id
-        script_filename: str = script.filename
-        script_logical_path: str = script.logical_path
-        script_display_name: str = script.display_name
-        script_description: str | None = script.description
-        script_folder_id: int | None = script.folder_id
-        script_created_by_id: int = script.created_by_id
-        script_created_at: datetime = script.created_at
-        script_updated_at: datetime = script.updated_at
-        created_by_id: int = script.created_by.id
-        created_by_login: str = script.created_by.login
-        
-        # Check if user is script owner or folder owner
-        from sqlalchemy import select
-        from src.scripts_manager.models import Folder
-        can_edit = script_created_by_id == current_user.id or current_user.is_admin
-        can_delete = script_created_by_id == current_user.id or current_user.is_admin
-        if script_folder_id and not can_edit:
-            folder_result = await db.execute(
-                select(Folder).where(Folder.id == script_folder_id)
-            )
-            folder = folder_result.scalar_one_or_none()
-            if folder:
-                can_edit = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-        if script_folder_id and not can_delete:
-            folder_result = await db.execute(
-                select(Folder).where(Folder.id == script_folder_id)
-            )
-            folder = folder_result.scalar_one_or_none()
-            if folder:
-                can_delete = await scripts_service._is_folder_owner_or_parent_owner(db, folder, current_user)
-        
-        return ScriptResponse(
-            id=script_id_val,
-            filename=script_filename,
-            logical_path=script_logical_path,
-            display_name=script_display_name,
-            description=script_description,
-            folder_id=script_folder_id,
-            created_by={"id": created_by_id, "login": created_by_login},
-            created_at=script_created_at,
-            updated_at=script_updated_at,
-            can_edit=can_edit,
-            can_delete=can_delete,
+        # Script is already reloaded in service with created_by, folder and description
+        # Check if user is script owner or folder owner (same rule for edit and delete)
+        can_edit = await scripts_service._can_manage(
+            db, script.created_by_id, script.folder_id, current_user
+        )
+        
+        # Same dict builder as get_script, rendered by orjson without a second validation pass
+        return ORJSONResponse(
+            content=scripts_service._build_script_response(script, current_user, can_edit)
         )
         
     except Exception as e:
@@ -744,7 +769,8 @@ async def delete_script(
     script_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> None:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Delete script.
     
@@ -752,6 +778,10 @@ async def delete_script(
         script_id: Script ID
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
+        
+    Returns:
+        Empty 204 response
         
     Raises:
         HTTPException: If deletion fails
@@ -763,6 +793,8 @@ async def delete_script(
             user=current_user,
         )
         
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        
     except Exception as e:
         raise handle_error(e, "delete_script")
 
@@ -774,22 +806,39 @@ async def delete_script(
     description="Get complete scripts tree with permissions.",
 )
 async def get_scripts_tree(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> ScriptsTreeResponse:
+    scripts_service: ScriptsManagerService = Depends(get_scripts_service),
+) -> Response:
     """
     Get complete scripts tree.
     
     Args:
+        request: Incoming request
         db: Database session
         current_user: Current authenticated user
+        scripts_service: Scripts manager service
         
     Returns:
         Complete scripts tree
     """
-    tree = await scripts_service.get_scripts_tree(db=db, user=current_user)
+    # One rendered tree per user, reused while the tree version (a single DB row bumped
+    # by every folder/script write, so changes made by other workers count too) stays the same
+    cache_key = (current_user.id, current_user.is_admin)
+    tree_version = await scripts_service.get_tree_version(db)
+    cached: tuple[Any, bytes] | None = scripts_tree_cache.get(cache_key)
+    if cached is not None and cached[0] == tree_version:
+        body = cached[1]
+    else:
+        tree = await scripts_service.get_scripts_tree(db=db, user=current_user)
+        
+        # Service output comes from DB rows and matches the schema: render it with orjson
+        # directly, response_model is kept for OpenAPI only
+        body = ORJSONResponse(content=tree).body
+        scripts_tree_cache.set(cache_key, (tree_version, body))
     
-    return ScriptsTreeResponse.model_validate(tree)
+    return etag_json_response(request, body)
 
 
 
@@ -1,22 +1,37 @@
 """Pydantic schemas for scripts and folders management."""
 
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 
 from src.scripts_manager.error_codes import ErrorCode
 
 
+def _zero_to_none(value: int | None) -> int | None:
+    """Treat folder ID 0 as root folder (None)."""
+    return value or None
+
+
+def _blank_to_none(value: str | None) -> str | None:
+    """Treat empty or whitespace-only string as missing value."""
+    return value if value and not value.isspace() else None
+
+
+# Optional folder ID, 0 means root folder
+OptionalFolderId = Annotated[int | None, AfterValidator(_zero_to_none)]
+
+# Optional description, empty or whitespace-only means no description
+OptionalDescription = Annotated[str | None, AfterValidator(_blank_to_none)]
+
+
 class UserInfo(BaseModel):
     """User information for responses."""
 
     id: int = Field(description="User ID")
     login: str = Field(description="User login")
 
-    class Config:
-        """Pydantic config."""
-
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FolderBase(BaseModel):
@@ -59,10 +74,7 @@ class FolderResponse(BaseModel):
     can_edit: bool = Field(description="Can user edit this folder")
     can_delete: bool = Field(description="Can user delete this folder")
 
-    class Config:
-        """Pydantic config."""
-
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ScriptBase(BaseModel):
@@ -139,10 +151,38 @@ class ScriptResponse(BaseModel):
     can_edit: bool = Field(description="Can user edit this script")
     can_delete: bool = Field(description="Can user delete this script")
 
-    class Config:
-        """Pydantic config."""
+    model_config = ConfigDict(from_attributes=True)
+
 
-        from_attributes = True
+class ScriptsContentBatchRequest(BaseModel):
+    """Schema for batch script content request."""
+
+    script_ids: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="IDs of scripts to fetch content for",
+    )
+
+
+class ScriptContentItem(BaseModel):
+    """Schema for one script content in batch response."""
+
+    id: int = Field(description="Script ID")
+    content: str = Field(description="Script source code")
+
+
+class ScriptsContentBatchResponse(BaseModel):
+    """Schema for batch script content response."""
+
+    scripts: list[ScriptContentItem] = Field(
+        default_factory=list,
+        description="Script contents in request order",
+    )
+    missing: list[int] = Field(
+        default_factory=list,
+        description="Requested IDs with no script or no readable script file",
+    )
 
 
 class FolderTreeItem(BaseModel):
@@ -1,15 +1,21 @@
 """Service for managing scripts and folders."""
 
+import asyncio
+import os
+from collections import defaultdict
 from pathlib import Path
 from typing import Any
 
-from sqlalchemy import delete, select
+from sqlalchemy import CTE, Row, String, delete, exists, func, lambda_stmt, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, joinedload, load_only, raiseload, undefer_group
+from sqlalchemy.orm.attributes import set_committed_value
 
 from src.auth.models import User
 from src.config import settings
 from src.logger import get_logger
+from src.scripts_manager.cache import script_content_cache
 from src.scripts_manager.error_codes import ErrorCode
 from src.scripts_manager.exceptions import (
     ConflictError,
@@ -17,11 +23,59 @@ from src.scripts_manager.exceptions import (
     ResourceNotFoundError,
     ValidationError,
 )
-from src.scripts_manager.models import Folder, Script
+from src.scripts_manager.models import TREE_VERSION_ROW_ID, Folder, Script, ScriptsTreeVersion
 from src.scripts_manager.validators import validate_script_content
 
 logger = get_logger(__name__)
 
+# Minimum buffer for script file writes, so a typical script is flushed with one write()
+WRITE_BUFFER_SIZE: int = 64 * 1024
+
+
+def _safe_unlink(path: Path) -> None:
+    """
+    Delete a script file, logging instead of raising on failure.
+    
+    Args:
+        path: Path to the file to delete
+    """
+    try:
+        path.unlink(missing_ok=True)
+        logger.debug("Script file deleted", path=str(path))
+    except OSError as e:
+        logger.warning("Failed to delete script file", path=str(path), error=str(e))
+
+
+def _write_script_file(path: Path, content: str) -> None:
+    """
+    Overwrite a script file with content encoded once and written in a single call.
+    
+    Args:
+        path: Path to the script file
+        content: Script content
+    """
+    data: bytes = content.encode("utf-8")
+    with open(path, "wb", buffering=max(WRITE_BUFFER_SIZE, len(data))) as f:
+        f.write(data)
+
+
+def read_script_file(path: Path) -> str:
+    """
+    Read a script file as UTF-8 text with a single raw read.
+    
+    Unbuffered FileIO.readall sizes its buffer from fstat, so the bytes are read
+    in one go and decoded once, without the text IO layer.
+    
+    Args:
+        path: Path to the script file
+        
+    Returns:
+        Script content
+    """
+    with open(path, "rb", buffering=0) as f:
+        data: bytes = f.readall()
+    return data.decode("utf-8")
+
 
 class ScriptsManagerService:
     """Service for managing scripts and folders."""
@@ -32,21 +86,107 @@ class ScriptsManagerService:
         # Ensure scripts directory exists
         self.scripts_dir.mkdir(parents=True, exist_ok=True)
 
-    def _build_logical_path(self, filename: str, folder: Folder | None) -> str:
+    async def _bump_tree_version(self, db: AsyncSession) -> None:
+        """
+        Bump the shared tree version in the current transaction.
+        
+        Called right before committing any folder/script change, so the new
+        version becomes visible to every worker exactly when the change does
+        and is rolled back together with it.
+        
+        Args:
+            db: Database session
+        """
+        await db.execute(
+            update(ScriptsTreeVersion)
+            .where(ScriptsTreeVersion.id == TREE_VERSION_ROW_ID)
+            .values(version=ScriptsTreeVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def init_tree_version(self, db: AsyncSession) -> None:
+        """
+        Create the tree version row if it does not exist yet.
+        
+        Args:
+            db: Database session
+        """
+        if await db.get(ScriptsTreeVersion, TREE_VERSION_ROW_ID) is not None:
+            return
+        db.add(ScriptsTreeVersion(id=TREE_VERSION_ROW_ID, version=0))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another worker created it concurrently
+            await db.rollback()
+
+    def _create_storage_file(self, filename: str, content: str) -> str:
+        """
+        Create a new script file, picking the first free name atomically.
+        
+        Each candidate is opened with O_CREAT | O_EXCL, so taking a name is a single
+        syscall and two concurrent uploads can never end up with the same file.
+        
+        Args:
+            filename: Preferred filename (with .py extension)
+            content: Script content
+            
+        Returns:
+            Storage filename actually used (e.g., "test_1.py" if "test.py" was taken)
+        """
+        name_part: str = filename[:-3]  # Without .py
+        storage_filename: str = filename
+        counter: int = 0
+        while True:
+            try:
+                fd: int = os.open(
+                    self.scripts_dir / storage_filename,
+                    os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                    0o644,
+                )
+                break
+            except FileExistsError:
+                counter += 1
+                storage_filename = f"{name_part}_{counter}.py"
+        
+        data: bytes = content.encode("utf-8")
+        with open(fd, "wb", buffering=max(WRITE_BUFFER_SIZE, len(data))) as f:
+            f.write(data)
+        return storage_filename
+
+    def _build_logical_path(self, filename: str, folder_path: str | None) -> str:
         """
         Build logical path for script based on folder hierarchy.
         
         Args:
             filename: Script filename
-            folder: Folder object (None for root)
+            folder_path: Folder path (None for root)
             
         Returns:
             Logical path (e.g., "geology/test.py")
         """
-        if folder:
-            return f"{folder.path}/{filename}"
+        if folder_path:
+            return f"{folder_path}/{filename}"
         return filename
 
+    async def _get_folder_path(self, db: AsyncSession, folder_id: int) -> str | None:
+        """
+        Get folder path by ID with a single primary-key lookup of the path column.
+        
+        Not cached: the path is persisted into new folders and scripts, so it must
+        reflect the latest committed rename in any worker.
+        
+        Args:
+            db: Database session
+            folder_id: Folder ID
+            
+        Returns:
+            Folder path or None if folder not found
+        """
+        result = await db.execute(select(Folder.path).where(Folder.id == folder_id))
+        folder_path: str | None = result.scalar_one_or_none()
+        return folder_path
+
     async def create_folder(
         self,
         db: AsyncSession,
@@ -69,19 +209,16 @@ class ScriptsManagerService:
         Raises:
             ValueError: If folder already exists or parent not found
         """
-        # Get parent folder if specified
-        parent: Folder | None = None
-        parent_path: str = ""
+        # Get parent folder path if specified
+        parent_path: str | None = None
         if parent_id:
-            parent_result = await db.execute(select(Folder).where(Folder.id == parent_id))
-            parent = parent_result.scalar_one_or_none()
-            if not parent:
+            parent_path = await self._get_folder_path(db, parent_id)
+            if parent_path is None:
                 raise ResourceNotFoundError(
                     ErrorCode.PARENT_FOLDER_NOT_FOUND,
                     f"Родительская папка с id {parent_id} не найдена",
                     {"parent_id": str(parent_id)},
                 )
-            parent_path = parent.path
         
         # Build folder path
         if parent_path:
@@ -89,16 +226,8 @@ class ScriptsManagerService:
         else:
             folder_path = name
         
-        # Check if folder already exists in DB
-        existing = await db.execute(select(Folder).where(Folder.path == folder_path))
-        if existing.scalar_one_or_none():
-            raise ConflictError(
-                ErrorCode.FOLDER_ALREADY_EXISTS,
-                f"Папка '{folder_path}' уже существует",
-                {"path": folder_path},
-            )
-        
-        # Create folder in DB only
+        # Create folder in DB only. The unique index on path rejects duplicates,
+        # so there is no separate existence check (and no race between check and insert)
         folder: Folder = Folder(
             name=name,
             path=folder_path,
@@ -107,8 +236,21 @@ class ScriptsManagerService:
         )
         
         db.add(folder)
-        await db.commit()
-        await db.refresh(folder)
+        await self._bump_tree_version(db)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # Only report a conflict if the path is really taken, e.g. not a parent deleted meanwhile
+            if await db.scalar(select(exists().where(Folder.path == folder_path))):
+                raise ConflictError(
+                    ErrorCode.FOLDER_ALREADY_EXISTS,
+                    f"Папка '{folder_path}' уже существует",
+                    {"path": folder_path},
+                )
+            raise
+        # New folder is owned by the current user, populate the relationship without a SELECT
+        set_committed_value(folder, "created_by", user)
         
         logger.info("Folder created", folder_id=folder.id, path=folder_path, user_id=user.id)
         
@@ -167,12 +309,11 @@ class ScriptsManagerService:
                 {"error_code": ErrorCode.INVALID_SCRIPT_CONTENT.value},
             )
         
-        # Get folder if specified
-        folder: Folder | None = None
+        # Get folder path if specified
+        folder_path: str | None = None
         if folder_id:
-            folder_result = await db.execute(select(Folder).where(Folder.id == folder_id))
-            folder = folder_result.scalar_one_or_none()
-            if not folder:
+            folder_path = await self._get_folder_path(db, folder_id)
+            if folder_path is None:
                 raise ResourceNotFoundError(
                     ErrorCode.FOLDER_NOT_FOUND,
                     f"Папка с id {folder_id} не найдена",
@@ -180,11 +321,11 @@ class ScriptsManagerService:
                 )
         
         # Build logical path
-        logical_path: str = self._build_logical_path(filename, folder)
+        logical_path: str = self._build_logical_path(filename, folder_path)
         
         # Check if script already exists in this logical location
         existing_result = await db.execute(
-            select(Script).where(Script.logical_path == logical_path)
+            lambda_stmt(lambda: select(Script).where(Script.logical_path == logical_path))
         )
         existing_script: Script | None = existing_result.scalar_one_or_none()
         
@@ -211,10 +352,13 @@ class ScriptsManagerService:
             
             # Update file content
             storage_path: Path = self.scripts_dir / existing_script.storage_filename
-            storage_path.write_text(content, encoding="utf-8")
+            await asyncio.to_thread(_write_script_file, storage_path, content)
             
+            # Single UPDATE: updated_at comes back via RETURNING (eager_defaults on Script)
+            await self._bump_tree_version(db)
             await db.commit()
-            await db.refresh(existing_script, ["created_by"])
+            # Replacing user becomes the creator, populate the relationship without a SELECT
+            set_committed_value(existing_script, "created_by", user)
             
             logger.info(
                 "Script replaced",
@@ -225,27 +369,15 @@ class ScriptsManagerService:
             
             return existing_script
         
-        # Create new script file in root directory
-        storage_filename: str = filename
-        storage_path: Path = self.scripts_dir / storage_filename
-        
-        # If file already exists in filesystem, generate unique name
-        if storage_path.exists():
-            counter: int = 1
-            name_part: str = storage_filename[:-3]  # Without .py
-            while storage_path.exists():
-                storage_filename = f"{name_part}_{counter}.py"
-                storage_path = self.scripts_dir / storage_filename
-                counter += 1
+        # Create new script file in root directory under a free name
+        storage_filename: str = await asyncio.to_thread(self._create_storage_file, filename, content)
+        if storage_filename != filename:
             logger.warning(
                 "File with same name exists, using unique name",
                 original=filename,
                 storage=storage_filename,
             )
         
-        # Write script file
-        storage_path.write_text(content, encoding="utf-8")
-        
         # Create script in DB
         script: Script = Script(
             filename=filename,
@@ -258,8 +390,10 @@ class ScriptsManagerService:
         )
         
         db.add(script)
+        await self._bump_tree_version(db)
         await db.commit()
-        await db.refresh(script, ["created_by"])
+        # New script is owned by the current user, populate the relationship without a SELECT
+        set_committed_value(script, "created_by", user)
         
         logger.info(
             "Script created",
@@ -299,11 +433,19 @@ class ScriptsManagerService:
         Raises:
             ValueError: If script not found or user has no permission
         """
-        # Get script with folder relationship loaded
+        # Get script with everything the response needs, so no reload is needed after commit
         result = await db.execute(
-            select(Script)
-            .where(Script.id == script_id)
-            .options(selectinload(Script.folder))
+            lambda_stmt(
+                lambda: select(Script)
+                .where(Script.id == script_id)
+                .options(
+                    joinedload(Script.created_by).load_only(User.id, User.login),
+                    joinedload(Script.folder),
+                    undefer_group("detail"),
+                    # Any other relationship access would be a hidden extra query: fail loudly
+                    raiseload("*"),
+                )
+            )
         )
         script: Script | None = result.scalar_one_or_none()
         
@@ -315,12 +457,7 @@ class ScriptsManagerService:
             )
         
         # Check permissions: user must be script owner, folder owner, or admin
-        script_owner = script.created_by_id == user.id
-        folder_owner = False
-        if script.folder:
-            folder_owner = await self._is_folder_owner_or_parent_owner(db, script.folder, user)
-        
-        if not (script_owner or folder_owner or user.is_admin):
+        if not await self._can_manage(db, script.created_by_id, script.folder_id, user):
             raise PermissionError(
                 ErrorCode.NOT_SCRIPT_OWNER,
                 "У вас нет прав для редактирования этого скрипта",
@@ -350,7 +487,7 @@ class ScriptsManagerService:
             
             # Update file content
             storage_path: Path = self.scripts_dir / script.storage_filename
-            storage_path.write_text(content, encoding="utf-8")
+            await asyncio.to_thread(_write_script_file, storage_path, content)
         
         # Handle filename change (changes logical_path)
         if filename is not None:
@@ -361,14 +498,16 @@ class ScriptsManagerService:
                 )
             
             # Build new logical path (folder is already loaded)
-            new_logical_path: str = self._build_logical_path(filename, script.folder)
+            new_logical_path: str = self._build_logical_path(
+                filename, script.folder.path if script.folder else None
+            )
             
-            # Check if new logical path exists
+            # Check if new logical path exists (ID only, no ORM row to hydrate)
             existing_result = await db.execute(
-                select(Script).where(Script.logical_path == new_logical_path)
+                lambda_stmt(lambda: select(Script.id).where(Script.logical_path == new_logical_path))
             )
-            existing: Script | None = existing_result.scalar_one_or_none()
-            if existing and existing.id != script_id:
+            existing_id: int | None = existing_result.scalar_one_or_none()
+            if existing_id is not None and existing_id != script_id:
                 raise ConflictError(
                     ErrorCode.SCRIPT_ALREADY_EXISTS,
                     f"Скрипт '{new_logical_path}' уже существует",
@@ -379,23 +518,13 @@ class ScriptsManagerService:
             script.filename = filename
             script.logical_path = new_logical_path
         
-        # Store script_id before commit
-        script_id_val: int = script.id
-        
-        await db.flush()
+        # updated_at comes back via RETURNING (eager_defaults on Script)
+        await self._bump_tree_version(db)
         await db.commit()
         
-        # Reload script from DB to get all updated values including updated_at
-        reload_result = await db.execute(
-            select(Script)
-            .where(Script.id == script_id_val)
-            .options(selectinload(Script.created_by), selectinload(Script.folder))
-        )
-        reloaded_script: Script = reload_result.scalar_one()
-        
-        logger.info("Script updated", script_id=reloaded_script.id, user_id=user.id)
+        logger.info("Script updated", script_id=script.id, user_id=user.id)
         
-        return reloaded_script
+        return script
 
     async def delete_script(
         self,
@@ -415,8 +544,7 @@ class ScriptsManagerService:
             ValueError: If script not found or user has no permission
         """
         # Get script
-        result = await db.execute(select(Script).where(Script.id == script_id))
-        script: Script | None = result.scalar_one_or_none()
+        script: Script | None = await db.get(Script, script_id)
         
         if not script:
             raise ResourceNotFoundError(
@@ -426,17 +554,7 @@ class ScriptsManagerService:
             )
         
         # Check permissions: user must be script owner, folder owner, or admin
-        script_owner = script.created_by_id == user.id
-        folder_owner = False
-        if script.folder_id:
-            folder_result = await db.execute(
-                select(Folder).where(Folder.id == script.folder_id)
-            )
-            folder = folder_result.scalar_one_or_none()
-            if folder:
-                folder_owner = await self._is_folder_owner_or_parent_owner(db, folder, user)
-        
-        if not (script_owner or folder_owner or user.is_admin):
+        if not await self._can_manage(db, script.created_by_id, script.folder_id, user):
             raise PermissionError(
                 ErrorCode.NOT_SCRIPT_OWNER,
                     "У вас нет прав для удаления этого скрипта",
@@ -447,15 +565,14 @@ class ScriptsManagerService:
         logical_path: str = script.logical_path
         storage_filename: str = script.storage_filename
         
-        # Delete file from root directory
-        storage_path: Path = self.scripts_dir / storage_filename
-        if storage_path.exists():
-            storage_path.unlink()
-        
         # Delete from DB using delete() statement
         await db.execute(delete(Script).where(Script.id == script_id))
+        await self._bump_tree_version(db)
         await db.commit()
         
+        # Delete file only after commit: a failed commit must not leave a row without its file
+        await asyncio.to_thread(_safe_unlink, self.scripts_dir / storage_filename)
+        
         logger.info(
             "Script deleted",
             script_id=script_id,
@@ -485,11 +602,18 @@ class ScriptsManagerService:
         Raises:
             ValueError: If folder not found or user has no permission
         """
-        # Get folder with relationships
+        # Get folder with everything the response needs, so no reload is needed after commit
         result = await db.execute(
-            select(Folder)
-            .where(Folder.id == folder_id)
-            .options(selectinload(Folder.parent))
+            lambda_stmt(
+                lambda: select(Folder)
+                .where(Folder.id == folder_id)
+                .options(
+                    joinedload(Folder.created_by).load_only(User.id, User.login),
+                    joinedload(Folder.parent),
+                    # Any other relationship access would be a hidden extra query: fail loudly
+                    raiseload("*"),
+                )
+            )
         )
         folder: Folder | None = result.scalar_one_or_none()
         
@@ -519,90 +643,133 @@ class ScriptsManagerService:
             else:
                 new_path = name
             
-            # Check if new path exists
-            existing = await db.execute(select(Folder).where(Folder.path == new_path))
-            if existing.scalar_one_or_none():
+            # Check if new path exists (ID only, no ORM row to hydrate)
+            existing = await db.execute(
+                lambda_stmt(lambda: select(Folder.id).where(Folder.path == new_path))
+            )
+            if existing.scalar_one_or_none() is not None:
                 raise ConflictError(
                     ErrorCode.FOLDER_ALREADY_EXISTS,
                     f"Папка '{new_path}' уже существует",
                     {"path": new_path},
                 )
             
-            # Update folder and all children paths recursively
-            await self._update_folder_path_recursive(db, folder, new_path)
+            # Update folder and all children paths
+            await self._update_subtree_paths(db, folder, new_path)
             
             folder.name = name
             folder.path = new_path
         
-        # Store folder_id before commit
-        folder_id_val: int = folder.id
-        
-        # Flush and commit changes
-        await db.flush()
+        # Flush and commit changes; updated_at comes back via RETURNING (eager_defaults on Folder)
+        await self._bump_tree_version(db)
         await db.commit()
         
-        # Reload folder from DB to get all updated values including updated_at
-        # This ensures we have a fresh object with all fields loaded
-        reload_result = await db.execute(
-            select(Folder)
-            .where(Folder.id == folder_id_val)
-            .options(selectinload(Folder.created_by), selectinload(Folder.parent))
-        )
-        reloaded_folder: Folder = reload_result.scalar_one()
-        
-        logger.info("Folder updated", folder_id=reloaded_folder.id, user_id=user.id)
+        logger.info("Folder updated", folder_id=folder.id, user_id=user.id)
         
-        return reloaded_folder
+        return folder
 
-    async def _update_folder_path_recursive(
+    async def _update_subtree_paths(
         self,
         db: AsyncSession,
         folder: Folder,
         new_base_path: str,
     ) -> None:
         """
-        Recursively update logical paths for folder and all scripts in it.
+        Update paths of folder, all its subfolders and logical paths of all scripts in them.
+        
+        Every path below the folder starts with the folder path, so descendants are
+        rewritten by swapping that prefix in two bulk UPDATE statements, without
+        loading any rows.
         
         Args:
             db: Database session
             folder: Folder to update
             new_base_path: New base path
         """
-        # Update folder path
+        old_base_path: str = folder.path
+        subtree = self._subtree_cte(folder.id)
+        subtree_ids = select(subtree.c.id)
+        # SQL substr() is 1-based: keeps "/..." right after the old prefix
+        tail_start: int = len(old_base_path) + 1
+        
         folder.path = new_base_path
         
-        # Update all scripts in folder (logical_path changes)
-        scripts_result = await db.execute(
-            select(Script).where(Script.folder_id == folder.id)
+        # Descendant objects are not loaded in this session, nothing to synchronize
+        await db.execute(
+            update(Folder)
+            .where(Folder.id.in_(subtree_ids), Folder.id != folder.id)
+            .values(path=new_base_path + func.substr(Folder.path, tail_start, type_=String))
+            .execution_options(synchronize_session=False)
         )
-        scripts: list[Script] = list(scripts_result.scalars().all())
-        
-        for script in scripts:
-            script.logical_path = f"{new_base_path}/{script.filename}"
+        await db.execute(
+            update(Script)
+            .where(Script.folder_id.in_(subtree_ids))
+            .values(logical_path=new_base_path + func.substr(Script.logical_path, tail_start, type_=String))
+            .execution_options(synchronize_session=False)
+        )
+
+    def _subtree_cte(self, root_id: int) -> CTE:
+        """
+        Build recursive CTE with folder and all its descendants.
         
-        # Update all subfolders recursively
-        subfolders_result = await db.execute(
-            select(Folder).where(Folder.parent_id == folder.id)
+        Args:
+            root_id: Subtree root folder ID
+            
+        Returns:
+            CTE with id and depth (0 for root) columns
+        """
+        subtree = (
+            select(Folder.id, literal(0).label("depth"))
+            .where(Folder.id == root_id)
+            .cte("subtree", recursive=True)
+        )
+        child = aliased(Folder)
+        return subtree.union_all(
+            select(child.id, subtree.c.depth + 1)
+            .join(subtree, child.parent_id == subtree.c.id)
         )
-        subfolders: list[Folder] = list(subfolders_result.scalars().all())
+
+    async def _can_manage(
+        self,
+        db: AsyncSession,
+        owner_id: int,
+        folder_id: int | None,
+        user: User,
+    ) -> bool:
+        """
+        Check if user can edit and delete a folder or script.
         
-        for subfolder in subfolders:
-            subfolder_name: str = subfolder.name
-            new_subfolder_path: str = f"{new_base_path}/{subfolder_name}"
-            await self._update_folder_path_recursive(db, subfolder, new_subfolder_path)
+        Args:
+            db: Database session
+            owner_id: Creator ID of the folder or script
+            folder_id: Folder itself for folders, containing folder for scripts (None for root)
+            user: User to check
+            
+        Returns:
+            True if user is admin, owner, or owner of the folder or any parent folder
+        """
+        if owner_id == user.id or user.is_admin:
+            return True
+        if folder_id is None:
+            return False
+        return await self._is_folder_owner_or_parent_owner(db, folder_id, user)
 
     async def _is_folder_owner_or_parent_owner(
         self,
         db: AsyncSession,
-        folder: Folder,
+        folder_id: int,
         user: User,
     ) -> bool:
         """
         Check if user is owner of folder or any parent folder.
         
+        The whole ancestor chain is checked in SQL with a single recursive CTE
+        EXISTS query. Results are memoized in the session info, so within one
+        request (one session) every folder is checked at most once per user.
+        
         Args:
             db: Database session
-            folder: Folder to check
+            folder_id: Folder ID to check
             user: User to check
             
         Returns:
@@ -611,20 +778,28 @@ class ScriptsManagerService:
         if user.is_admin:
             return True
         
-        # Check if user is owner of this folder
-        if folder.created_by_id == user.id:
-            return True
+        cache: dict[tuple[int, int], bool] = db.info.setdefault("folder_owner_cache", {})
+        key: tuple[int, int] = (folder_id, user.id)
+        if key in cache:
+            return cache[key]
         
-        # Check parent folders recursively
-        if folder.parent_id:
-            parent_result = await db.execute(
-                select(Folder).where(Folder.id == folder.parent_id)
-            )
-            parent = parent_result.scalar_one_or_none()
-            if parent:
-                return await self._is_folder_owner_or_parent_owner(db, parent, user)
+        ancestors = (
+            select(Folder.id, Folder.parent_id, Folder.created_by_id)
+            .where(Folder.id == folder_id)
+            .cte("ancestors", recursive=True)
+        )
+        parent = aliased(Folder)
+        ancestors = ancestors.union_all(
+            select(parent.id, parent.parent_id, parent.created_by_id)
+            .join(ancestors, parent.id == ancestors.c.parent_id)
+        )
+        result = await db.execute(
+            select(exists().where(ancestors.c.created_by_id == user.id))
+        )
+        is_owner: bool = bool(result.scalar())
         
-        return False
+        cache[key] = is_owner
+        return is_owner
 
     async def _check_folder_deletion_permissions(
         self,
@@ -648,7 +823,7 @@ class ScriptsManagerService:
             return True, None
         
         # Check if user is folder owner or parent folder owner
-        folder_owner = await self._is_folder_owner_or_parent_owner(db, folder, user)
+        folder_owner = await self._is_folder_owner_or_parent_owner(db, folder.id, user)
         if not folder_owner:
             return False, f"У вас нет прав для удаления папки '{folder.name}'"
         
@@ -675,8 +850,7 @@ class ScriptsManagerService:
             ValueError: If folder not found or user has no permission
         """
         # Get folder
-        result = await db.execute(select(Folder).where(Folder.id == folder_id))
-        folder: Folder | None = result.scalar_one_or_none()
+        folder: Folder | None = await db.get(Folder, folder_id)
         
         if not folder:
             raise ResourceNotFoundError(
@@ -694,40 +868,40 @@ class ScriptsManagerService:
                 {"folder_id": str(folder_id)},
             )
         
-        # Collect all scripts to delete (for logging and file deletion)
-        all_scripts: list[Script] = []
-        await self._collect_folder_scripts(db, folder, all_scripts)
+        # Collect the whole subtree: folder IDs parent-before-children, then their scripts
+        subtree = self._subtree_cte(folder.id)
+        folder_ids_result = await db.execute(
+            select(subtree.c.id).order_by(subtree.c.depth)
+        )
+        folder_ids_to_delete: list[int] = list(folder_ids_result.scalars())
         
-        # Store path for logging before deletion
-        folder_path: str = folder.path
+        # Only IDs and storage file names are needed for file and row deletion
+        scripts_result = await db.execute(
+            select(Script)
+            .where(Script.folder_id.in_(select(subtree.c.id)))
+            .options(load_only(Script.id, Script.storage_filename))
+        )
+        all_scripts: list[Script] = list(scripts_result.scalars())
         
-        # Delete physical files for all scripts
-        for script in all_scripts:
-            storage_path: Path = self.scripts_dir / script.storage_filename
-            if storage_path.exists():
-                try:
-                    storage_path.unlink()
-                    logger.debug("Script file deleted", path=str(storage_path), script_id=script.id)
-                except Exception as e:
-                    logger.warning(
-                        "Failed to delete script file",
-                        path=str(storage_path),
-                        script_id=script.id,
-                        error=str(e),
-                    )
+        # Store path for logging and file paths for unlinking before deletion
+        folder_path: str = folder.path
+        storage_paths: list[Path] = [self.scripts_dir / script.storage_filename for script in all_scripts]
         
-        # Collect all folder IDs to delete (including subfolders)
-        folder_ids_to_delete: list[int] = []
-        await self._collect_folder_ids(db, folder, folder_ids_to_delete)
+        # Delete scripts first so that FK cascades have nothing left to walk
+        await self._delete_in_batches(db, Script, [script.id for script in all_scripts])
         
-        # Delete all scripts in these folders first (if cascade doesn't work)
-        if folder_ids_to_delete:
-            await db.execute(delete(Script).where(Script.folder_id.in_(folder_ids_to_delete)))
+        # Delete folders leaf-first: IDs are ordered by depth (parents first),
+        # so the reversed list never removes a folder that still has subfolders
+        await self._delete_in_batches(db, Folder, folder_ids_to_delete[::-1])
         
-        # Delete all folders (cascade should handle scripts, but we delete them explicitly above)
-        await db.execute(delete(Folder).where(Folder.id.in_(folder_ids_to_delete)))
+        # Single commit: the whole subtree is removed or nothing is
+        await self._bump_tree_version(db)
         await db.commit()
         
+        # Files go only after the rows are gone for good, concurrently in worker
+        # threads, so a large subtree does not block the event loop with serial syscalls
+        await asyncio.gather(*(asyncio.to_thread(_safe_unlink, path) for path in storage_paths))
+        
         logger.info(
             "Folder deleted",
             folder_id=folder_id,
@@ -737,61 +911,53 @@ class ScriptsManagerService:
             folders_count=len(folder_ids_to_delete),
         )
 
-    async def _collect_folder_scripts(
+    async def _delete_in_batches(
         self,
         db: AsyncSession,
-        folder: Folder,
-        scripts: list[Script],
+        model: type[Folder] | type[Script],
+        ids: list[int],
     ) -> None:
         """
-        Recursively collect all scripts in folder and subfolders.
+        Delete rows by ID in fixed-size batches within the current transaction.
+        
+        Bounds the number of bound parameters per statement when removing
+        large folder subtrees; committing is left to the caller.
         
         Args:
             db: Database session
-            folder: Folder to collect from
-            scripts: List to append scripts to
+            model: Model class to delete from
+            ids: Primary keys to delete, in deletion order
         """
-        # Get scripts in folder
-        scripts_result = await db.execute(
-            select(Script).where(Script.folder_id == folder.id)
-        )
-        scripts.extend(list(scripts_result.scalars().all()))
-        
-        # Get subfolders
-        subfolders_result = await db.execute(
-            select(Folder).where(Folder.parent_id == folder.id)
-        )
-        subfolders: list[Folder] = list(subfolders_result.scalars().all())
-        
-        # Recursively collect from subfolders
-        for subfolder in subfolders:
-            await self._collect_folder_scripts(db, subfolder, scripts)
+        batch_size: int = settings.delete_batch_size
+        for start in range(0, len(ids), batch_size):
+            batch: list[int] = ids[start:start + batch_size]
+            # Nothing from the subtree is used after deletion, skip the identity map scan
+            await db.execute(
+                delete(model)
+                .where(model.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
 
-    async def _collect_folder_ids(
-        self,
-        db: AsyncSession,
-        folder: Folder,
-        folder_ids: list[int],
-    ) -> None:
+    async def get_tree_version(self, db: AsyncSession) -> int:
         """
-        Recursively collect all folder IDs including subfolders.
+        Get version of the scripts tree for validating cached tree responses.
+        
+        A single primary-key lookup of the counter bumped by every folder/script
+        write (and user login change), so it is shared by all workers.
         
         Args:
             db: Database session
-            folder: Folder to collect from
-            folder_ids: List to append folder IDs to
+            
+        Returns:
+            Current tree version
         """
-        folder_ids.append(folder.id)
-        
-        # Get subfolders
-        subfolders_result = await db.execute(
-            select(Folder).where(Folder.parent_id == folder.id)
+        version: int | None = await db.scalar(
+            lambda_stmt(
+                lambda: select(ScriptsTreeVersion.version)
+                .where(ScriptsTreeVersion.id == TREE_VERSION_ROW_ID)
+            )
         )
-        subfolders: list[Folder] = list(subfolders_result.scalars().all())
-        
-        # Recursively collect from subfolders
-        for subfolder in subfolders:
-            await self._collect_folder_ids(db, subfolder, folder_ids)
+        return version or 0
 
     async def get_scripts_tree(
         self,
@@ -808,109 +974,140 @@ class ScriptsManagerService:
         Returns:
             Dictionary with tree structure
         """
-        # Get all folders with relationships
+        # Fetch plain column rows (creator login joined in) instead of ORM entities:
+        # no identity map, relationship loaders or per-object state for the whole tree
         folders_result = await db.execute(
-            select(Folder).options(selectinload(Folder.created_by))
+            select(
+                Folder.id,
+                Folder.name,
+                Folder.path,
+                Folder.parent_id,
+                Folder.created_by_id,
+                User.login,
+                Folder.created_at,
+                Folder.updated_at,
+            ).join(User, Folder.created_by_id == User.id)
         )
-        all_folders: list[Folder] = list(folders_result.scalars().all())
-        
-        # Get all scripts with relationships
-        scripts_result = await db.execute(
-            select(Script).options(selectinload(Script.created_by))
+        subfolders_by_parent: dict[int | None, list[Row]] = defaultdict(list)
+        for folder in folders_result:
+            subfolders_by_parent[folder.parent_id].append(folder)
+        
+        # Stream all scripts in fixed-size batches, grouping them by folder on the fly
+        scripts_by_folder: dict[int | None, list[Row]] = defaultdict(list)
+        scripts_stream = await db.stream(
+            select(
+                Script.id,
+                Script.filename,
+                Script.logical_path,
+                Script.display_name,
+                Script.description,
+                Script.folder_id,
+                Script.created_by_id,
+                User.login,
+                Script.created_at,
+                Script.updated_at,
+            )
+            .join(User, Script.created_by_id == User.id)
+            .execution_options(yield_per=settings.tree_stream_batch_size)
         )
-        all_scripts: list[Script] = list(scripts_result.scalars().all())
-        
-        # Build folder map
-        folder_map: dict[int, Folder] = {f.id: f for f in all_folders}
-        
-        # Build tree structure
-        root_folders: list[Folder] = [f for f in all_folders if f.parent_id is None]
-        root_scripts: list[Script] = [s for s in all_scripts if s.folder_id is None]
+        async for script in scripts_stream:
+            scripts_by_folder[script.folder_id].append(script)
+        
+        # Build response in memory, inheriting ownership top-down (no per-node queries).
+        # Breadth-first over a work list instead of recursion, so arbitrarily deep trees
+        # cannot hit the interpreter recursion limit
+        root_folders: list[dict[str, Any]] = []
+        pending: list[tuple[Row, bool, list[dict[str, Any]]]] = [
+            (folder, user.is_admin, root_folders) for folder in subfolders_by_parent[None]
+        ]
+        # The list grows while iterating: children are queued after their parent is built
+        for folder, parent_owned, siblings in pending:
+            # Owner of a folder (or of any parent folder) can manage everything inside it
+            owned: bool = parent_owned or folder.created_by_id == user.id
+            item: dict[str, Any] = {
+                "folder": self._build_folder_row(folder, owned),
+                # Inside an owned folder every script is manageable, skip the per-script check
+                "scripts": [
+                    self._build_script_row(script, owned or script.created_by_id == user.id)
+                    for script in scripts_by_folder.get(folder.id, [])
+                ],
+                "subfolders": [],
+            }
+            siblings.append(item)
+            pending.extend(
+                (subfolder, owned, item["subfolders"])
+                for subfolder in subfolders_by_parent.get(folder.id, [])
+            )
         
-        # Build response
         tree: dict[str, Any] = {
-            "root_folders": [
-                await self._build_folder_tree_item(db, folder, folder_map, all_scripts, user)
-                for folder in root_folders
-            ],
+            "root_folders": root_folders,
             "root_scripts": [
-                await self._build_script_response(script, user, db) for script in root_scripts
+                self._build_script_row(script, user.is_admin or script.created_by_id == user.id)
+                for script in scripts_by_folder[None]
             ],
         }
         
         return tree
 
-    async def _build_folder_tree_item(
-        self,
-        db: AsyncSession,
-        folder: Folder,
-        folder_map: dict[int, Folder],
-        all_scripts: list[Script],
-        user: User,
-    ) -> dict[str, Any]:
+    def _build_folder_row(self, folder: Row, owned: bool) -> dict[str, Any]:
         """
-        Build folder tree item recursively.
+        Build folder response from a tree query row.
         
         Args:
-            db: Database session
-            folder: Folder to build
-            folder_map: Map of folder IDs to folders
-            all_scripts: All scripts list
-            user: Current user
+            folder: Folder row with creator login
+            owned: True if user is admin or owns the folder or any parent folder
             
         Returns:
-            Dictionary with folder tree item
+            Dictionary with folder data
         """
-        # Get scripts in this folder
-        folder_scripts: list[Script] = [
-            s for s in all_scripts if s.folder_id == folder.id
-        ]
-        
-        # Get subfolders
-        subfolders: list[Folder] = [
-            f for f in folder_map.values() if f.parent_id == folder.id
-        ]
-        
-        # Build subfolders recursively
-        subfolder_items: list[dict[str, Any]] = [
-            await self._build_folder_tree_item(db, sf, folder_map, all_scripts, user)
-            for sf in subfolders
-        ]
+        return {
+            "id": folder.id,
+            "name": folder.name,
+            "path": folder.path,
+            "parent_id": folder.parent_id,
+            "created_by": {"id": folder.created_by_id, "login": folder.login},
+            "created_at": folder.created_at,
+            "updated_at": folder.updated_at,
+            "can_edit": owned,
+            "can_delete": owned,
+        }
+
+    def _build_script_row(self, script: Row, can_manage: bool) -> dict[str, Any]:
+        """
+        Build script response from a tree query row.
         
+        Args:
+            script: Script row with creator login
+            can_manage: Whether user can edit and delete the script
+            
+        Returns:
+            Dictionary with script data
+        """
         return {
-            "folder": await self._build_folder_response(folder, user, db),
-            "scripts": [
-                await self._build_script_response(script, user, db) for script in folder_scripts
-            ],
-            "subfolders": subfolder_items,
+            "id": script.id,
+            "filename": script.filename,
+            "logical_path": script.logical_path,
+            "display_name": script.display_name,
+            "description": script.description,
+            "folder_id": script.folder_id,
+            "created_by": {"id": script.created_by_id, "login": script.login},
+            "created_at": script.created_at,
+            "updated_at": script.updated_at,
+            "can_edit": can_manage,
+            "can_delete": can_manage,
         }
 
-    async def _build_folder_response(
-        self,
-        folder: Folder,
-        user: User,
-        db: AsyncSession | None = None,
-    ) -> dict[str, Any]:
+    def _build_folder_response(self, folder: Folder, owned: bool) -> dict[str, Any]:
         """
         Build folder response with permissions.
         
         Args:
             folder: Folder object
-            user: Current user
-            db: Database session (optional, needed for parent owner check)
+            owned: True if user is admin or owns the folder or any parent folder
             
         Returns:
             Dictionary with folder data
         """
-        can_edit = folder.created_by_id == user.id or user.is_admin
-        can_delete = folder.created_by_id == user.id or user.is_admin
-        
-        # Check if user is owner of parent folder (if db is provided)
-        if db and not can_edit:
-            can_edit = await self._is_folder_owner_or_parent_owner(db, folder, user)
-        if db and not can_delete:
-            can_delete = await self._is_folder_owner_or_parent_owner(db, folder, user)
-        
         return {
             "id": folder.id,
             "name": folder.name,
@@ -919,15 +1116,15 @@ class ScriptsManagerService:
             "created_by": {"id": folder.created_by.id, "login": folder.created_by.login},
             "created_at": folder.created_at,
             "updated_at": folder.updated_at,
-            "can_edit": can_edit,
-            "can_delete": can_delete,
+            "can_edit": owned,
+            "can_delete": owned,
         }
 
-    async def _build_script_response(
+    def _build_script_response(
         self,
         script: Script,
         user: User,
-        db: AsyncSession | None = None,
+        folder_owned: bool,
     ) -> dict[str, Any]:
         """
         Build script response with permissions.
@@ -935,30 +1132,13 @@ class ScriptsManagerService:
         Args:
             script: Script object
             user: Current user
-            db: Database session (optional, needed for folder owner check)
+            folder_owned: True if user is admin or owns the script folder or any parent folder
             
         Returns:
             Dictionary with script data
         """
-        can_edit = script.created_by_id == user.id or user.is_admin
-        can_delete = script.created_by_id == user.id or user.is_admin
-        
-        # Check if user is owner of folder (if db is provided)
-        if db and script.folder_id and not can_edit:
-            folder_result = await db.execute(
-                select(Folder).where(Folder.id == script.folder_id)
-            )
-            folder = folder_result.scalar_one_or_none()
-            if folder:
-                can_edit = await self._is_folder_owner_or_parent_owner(db, folder, user)
-        
-        if db and script.folder_id and not can_delete:
-            folder_result = await db.execute(
-                select(Folder).where(Folder.id == script.folder_id)
-            )
-            folder = folder_result.scalar_one_or_none()
-            if folder:
-                can_delete = await self._is_folder_owner_or_parent_owner(db, folder, user)
+        # Edit and delete follow the same ownership rule
+        can_manage: bool = folder_owned or script.created_by_id == user.id
         
         return {
             "id": script.id,
@@ -970,10 +1150,112 @@ class ScriptsManagerService:
             "created_by": {"id": script.created_by.id, "login": script.created_by.login},
             "created_at": script.created_at,
             "updated_at": script.updated_at,
-            "can_edit": can_edit,
-            "can_delete": can_delete,
+            "can_edit": can_manage,
+            "can_delete": can_manage,
         }
 
+    async def _get_script_storage_path(self, db: AsyncSession, script_id: int) -> Path:
+        """
+        Get storage path of a script file without touching the filesystem.
+        
+        Args:
+            db: Database session
+            script_id: Script ID
+            
+        Returns:
+            Path to script file in storage (may not exist)
+            
+        Raises:
+            ResourceNotFoundError: If script not found
+        """
+        # Only the file name is needed: a single scalar, no ORM object to hydrate
+        result = await db.execute(
+            lambda_stmt(lambda: select(Script.storage_filename).where(Script.id == script_id))
+        )
+        storage_filename: str | None = result.scalar_one_or_none()
+        
+        if storage_filename is None:
+            raise ResourceNotFoundError(
+                ErrorCode.SCRIPT_NOT_FOUND,
+                f"Скрипт с id {script_id} не найден",
+                {"script_id": str(script_id)},
+            )
+        
+        return self.scripts_dir / storage_filename
+
+    def _script_file_not_found(self, script_id: int, storage_path: Path) -> ResourceNotFoundError:
+        """
+        Build error for a script whose DB row exists but file is missing.
+        
+        Args:
+            script_id: Script ID
+            storage_path: Expected path to script file
+            
+        Returns:
+            ResourceNotFoundError to raise
+        """
+        return ResourceNotFoundError(
+            ErrorCode.SCRIPT_NOT_FOUND,
+            f"Файл скрипта '{storage_path.name}' не найден в файловой системе",
+            {"storage_filename": storage_path.name, "script_id": str(script_id)},
+        )
+
+    async def get_script_file(
+        self,
+        db: AsyncSession,
+        script_id: int,
+        user: User,
+    ) -> tuple[Path, os.stat_result]:
+        """
+        Get path to script file in storage together with its stat.
+        
+        The stat call doubles as the existence check, so no separate exists() is made.
+        
+        Args:
+            db: Database session
+            script_id: Script ID
+            user: Current user
+            
+        Returns:
+            Tuple of (path to script file, its stat result)
+            
+        Raises:
+            ResourceNotFoundError: If script or its file not found
+        """
+        storage_path: Path = await self._get_script_storage_path(db, script_id)
+        try:
+            file_stat: os.stat_result = await asyncio.to_thread(storage_path.stat)
+        except FileNotFoundError:
+            raise self._script_file_not_found(script_id, storage_path)
+        
+        return storage_path, file_stat
+
+    async def read_script_content(self, storage_path: Path, file_stat: os.stat_result) -> str:
+        """
+        Read script file content, served from the process-local cache when possible.
+        
+        Entries are keyed by file name, size and mtime, so any rewrite of the file
+        makes the old entry unreachable without explicit invalidation. Files above
+        script_content_cache_max_file_size are read uncached, bounding the cache
+        memory to size * max file size.
+        
+        Args:
+            storage_path: Path to script file
+            file_stat: Stat result of the file, as returned by get_script_file
+            
+        Returns:
+            Script content as string
+        """
+        if file_stat.st_size > settings.script_content_cache_max_file_size:
+            return await asyncio.to_thread(read_script_file, storage_path)
+        
+        key: tuple[str, int, int] = (storage_path.name, file_stat.st_size, file_stat.st_mtime_ns)
+        content: str | None = script_content_cache.get(key)
+        if content is None:
+            content = await asyncio.to_thread(read_script_file, storage_path)
+            script_content_cache.set(key, content)
+        return content
+
     async def get_script_content(
         self,
         db: AsyncSession,
@@ -992,28 +1274,58 @@ class ScriptsManagerService:
             Script content as string
             
         Raises:
-            ValueError: If script not found
+            ResourceNotFoundError: If script or its file not found
         """
-        result = await db.execute(select(Script).where(Script.id == script_id))
-        script: Script | None = result.scalar_one_or_none()
-        
-        if not script:
-            raise ResourceNotFoundError(
-                ErrorCode.SCRIPT_NOT_FOUND,
-                f"Скрипт с id {script_id} не найден",
-                {"script_id": str(script_id)},
-            )
-        
-        storage_path: Path = self.scripts_dir / script.storage_filename
+        storage_path, file_stat = await self.get_script_file(db, script_id, user)
+        return await self.read_script_content(storage_path, file_stat)
+
+    async def get_scripts_content_batch(
+        self,
+        db: AsyncSession,
+        script_ids: list[int],
+        user: User,
+    ) -> dict[int, str]:
+        """
+        Get content of several scripts with one query and concurrent file reads.
         
-        if not storage_path.exists():
-            raise ResourceNotFoundError(
-                ErrorCode.SCRIPT_NOT_FOUND,
-                f"Файл скрипта '{script.storage_filename}' не найден в файловой системе",
-                {"storage_filename": script.storage_filename, "script_id": str(script_id)},
-            )
+        Args:
+            db: Database session
+            script_ids: Script IDs
+            user: Current user
+            
+        Returns:
+            Script content by script ID; scripts without a row or a readable file are left out
+        """
+        result = await db.execute(
+            select(Script.id, Script.storage_filename).where(Script.id.in_(script_ids))
+        )
+        rows: list[Row] = list(result.all())
+        
+        async def read(storage_filename: str) -> str | None:
+            storage_path: Path = self.scripts_dir / storage_filename
+            try:
+                file_stat: os.stat_result = await asyncio.to_thread(storage_path.stat)
+                return await self.read_script_content(storage_path, file_stat)
+            except FileNotFoundError:
+                logger.warning("Script file not found", storage_filename=storage_filename)
+                return None
+            except (OSError, UnicodeDecodeError) as e:
+                # One unreadable file must not fail the whole batch
+                logger.warning(
+                    "Script file not readable",
+                    storage_filename=storage_filename,
+                    error=str(e),
+                )
+                return None
         
-        return storage_path.read_text(encoding="utf-8")
+        contents: list[str | None] = await asyncio.gather(
+            *(read(row.storage_filename) for row in rows)
+        )
+        return {
+            row.id: content
+            for row, content in zip(rows, contents)
+            if content is not None
+        }
 
     async def get_script_by_logical_path(
         self,
@@ -1023,6 +1335,9 @@ class ScriptsManagerService:
         """
         Get script by logical path (for script executor).
         
+        Only id and storage_filename are loaded. The statement is built with
+        lambda_stmt, so its SQL is compiled once and cached for every execution.
+        
         Args:
             db: Database session
             logical_path: Logical path (e.g., "geology/test.py")
@@ -1031,6 +1346,10 @@ class ScriptsManagerService:
             Script object or None if not found
         """
         result = await db.execute(
-            select(Script).where(Script.logical_path == logical_path)
+            lambda_stmt(
+                lambda: select(Script)
+                .where(Script.logical_path == logical_path)
+                .options(load_only(Script.id, Script.storage_filename))
+            )
         )
         return result.scalar_one_or_none()
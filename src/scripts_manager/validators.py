@@ -1,9 +1,13 @@
 """Validators for scripts."""
 
 import ast
+import hashlib
+import re
 from pathlib import Path
 
+from src.config import settings
 from src.logger import get_logger
+from src.scripts_manager.cache import script_validation_cache
 
 logger = get_logger(__name__)
 
@@ -20,6 +24,37 @@ SERVICE_PATTERNS: list[str] = [
     "*.bak",
 ]
 
+# SERVICE_PATTERNS split for O(1) membership checks in is_service_file:
+# "*.ext" patterns match by suffix, everything else by exact name
+SERVICE_NAMES: frozenset[str] = frozenset(
+    pattern for pattern in SERVICE_PATTERNS if not pattern.startswith("*")
+)
+SERVICE_SUFFIXES: frozenset[str] = frozenset(
+    pattern[1:] for pattern in SERVICE_PATTERNS if pattern.startswith("*")
+)
+
+# Script filename: .py extension, 4 to 255 characters in total
+SCRIPT_FILENAME_PATTERN: re.Pattern[str] = re.compile(r"^.{1,252}\.py\Z")
+
+# Accepted annotations for the main() argument, bare or subscripted
+DICT_TYPE_NAMES: frozenset[str] = frozenset({"dict", "Dict"})
+
+# Leading characters scanned for NUL bytes to detect binary uploads
+BINARY_CHECK_SIZE: int = 4096
+
+
+def is_valid_script_filename(filename: str) -> bool:
+    """
+    Check script filename extension and length.
+    
+    Args:
+        filename: Script filename
+        
+    Returns:
+        True if filename ends with .py and has 4 to 255 characters
+    """
+    return SCRIPT_FILENAME_PATTERN.match(filename) is not None
+
 
 def is_service_file(path: Path) -> bool:
     """
@@ -31,22 +66,58 @@ def is_service_file(path: Path) -> bool:
     Returns:
         True if service file, False otherwise
     """
-    name: str = path.name
+    return path.name in SERVICE_NAMES or path.suffix in SERVICE_SUFFIXES
+
+
+def validate_script_content(content: str) -> tuple[bool, str | None]:
+    """
+    Validate script content - check for main function with one dict argument.
     
-    # Check exact matches
-    if name in ["__pycache__", ".git", ".DS_Store"]:
-        return True
+    Verdicts (negative ones included) are cached by content digest, so re-saving
+    or re-uploading unchanged text does not parse it again.
     
-    # Check extensions
-    if path.suffix in [".pyc", ".pyo", ".pyd", ".tmp", ".swp", ".bak"]:
-        return True
+    Args:
+        content: Script content as string
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    # Guard rails before hashing and parsing: oversized or binary uploads never reach the parser
+    if len(content) > settings.max_script_size:
+        return False, f"Скрипт превышает допустимый размер ({settings.max_script_size} символов)"
+    if "\x00" in content[:BINARY_CHECK_SIZE]:
+        return False, "Файл скрипта не является текстовым"
     
-    return False
+    # surrogatepass: lone surrogates (valid in JSON strings) must reach the parser's
+    # error path and come back as a validation error, not crash the hashing
+    content_hash: bytes = hashlib.blake2b(
+        content.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    verdict: tuple[bool, str | None] | None = script_validation_cache.get(content_hash)
+    if verdict is None:
+        verdict = _validate_script_content(content)
+        script_validation_cache.set(content_hash, verdict)
+    return verdict
 
 
-def validate_script_content(content: str) -> tuple[bool, str | None]:
+def _is_dict_annotation(annotation: ast.expr) -> bool:
     """
-    Validate script content - check for main function with one dict argument.
+    Check if annotation is dict, Dict, dict[...] or Dict[...].
+    
+    Args:
+        annotation: Annotation node of a function argument
+        
+    Returns:
+        True if annotation names a dict type
+    """
+    if type(annotation) is ast.Subscript:
+        annotation = annotation.value
+    return type(annotation) is ast.Name and annotation.id in DICT_TYPE_NAMES
+
+
+def _validate_script_content(content: str) -> tuple[bool, str | None]:
+    """
+    Parse script content and check its main function (uncached).
     
     Args:
         content: Script content as string
@@ -58,12 +129,23 @@ def validate_script_content(content: str) -> tuple[bool, str | None]:
         # Parse AST for safe validation
         tree: ast.Module = ast.parse(content)
         
-        # Search for main function
-        main_function = None
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == "main":
-                main_function = node
-                break
+        # Prefer a top-level main (the last definition wins, like at import time);
+        # fall back to one nested anywhere, e.g. under if/try, as before
+        main_function = next(
+            (
+                node
+                for node in reversed(tree.body)
+                if isinstance(node, ast.FunctionDef) and node.name == "main"
+            ),
+            None,
+        ) or next(
+            (
+                node
+                for node in ast.walk(tree)
+                if isinstance(node, ast.FunctionDef) and node.name == "main"
+            ),
+            None,
+        )
         
         if not main_function:
             return False, "Скрипт должен содержать функцию 'main' с одним аргументом типа dict"
@@ -73,21 +155,10 @@ def validate_script_content(content: str) -> tuple[bool, str | None]:
         if len(args) != 1:
             return False, "Функция 'main' должна принимать ровно один аргумент типа dict"
         
-        # Check that the argument has type annotation (dict or Dict)
+        # Check that the argument annotation, if any, is dict or Dict
         arg = args[0]
-        if arg.annotation:
-            # Check if annotation is dict or Dict
-            is_dict_type = False
-            if isinstance(arg.annotation, ast.Name):
-                # dict or Dict
-                is_dict_type = arg.annotation.id in ('dict', 'Dict')
-            elif isinstance(arg.annotation, ast.Subscript):
-                # dict[...] or Dict[...]
-                if isinstance(arg.annotation.value, ast.Name):
-                    is_dict_type = arg.annotation.value.id in ('dict', 'Dict')
-            
-            if not is_dict_type:
-                return False, "Аргумент функции 'main' должен иметь тип dict"
+        if arg.annotation and not _is_dict_annotation(arg.annotation):
+            return False, "Аргумент функции 'main' должен иметь тип dict"
         
         return True, None
         